@@ -1,15 +1,12 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
-
-from google import genai
-from google.genai import types
 
 import os
 import requests
 
 from search import search
+from suggest import suggest
 dir = './index'
 
 # Setup flask
@@ -19,8 +16,8 @@ CORS(app)
 # load env vars
 load_dotenv()
 
-# setup gemini api
-client = genai.Client(api_key=os.getenv("GEMINI_KEY"))
+# gemini client, created on the first /summary request (bs4 and google-genai are imported there too so workers start fast)
+client = None
 sys_instruct = "You are a website summarizer for a search engine. Your goal is to summarize scraped clean text for users to look at. Summarize the following content"
 
 # Search functionality
@@ -34,6 +31,21 @@ def search_path():
 
     return jsonify([url[0] for url in urls])
 
+# Autocomplete + "did you mean" suggestions
+@app.get('/suggest')
+def suggest_path():
+    query = request.args.get('q')
+    if not query:
+        return "error: no query provided", 400
+
+    # suggestions need lexicon.bin, which older indexes don't have
+    try:
+        suggestions = suggest(query, dir)
+    except FileNotFoundError:
+        return "error: lexicon.bin not found, run 'python lexicon.py' to build it", 503
+
+    return jsonify(suggestions)
+
 # LLM summary
 @app.get("/summary")
 def summarize():
@@ -41,6 +53,15 @@ def summarize():
     if not url:
         return "error: no query provided", 400
     
+    from bs4 import BeautifulSoup
+    from google import genai
+    from google.genai import types
+
+    # setup gemini api
+    global client
+    if client is None:
+        client = genai.Client(api_key=os.getenv("GEMINI_KEY"))
+
     # scraping time
     page = requests.get(url)
     soup = BeautifulSoup(page.content, 'html.parser')
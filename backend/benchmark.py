@@ -0,0 +1,136 @@
+import sys
+import json
+import time
+import subprocess
+import statistics
+
+# CHANGE THIS TO WHERE PARTIAL ALPHABETICAL INDEXES ARE STORED
+final_dir = "./index/"
+
+# CHANGE THESE TO BENCHMARK DIFFERENT QUERIES (can also be passed as command line arguments)
+queries = ["master of software engineering", "machine learning", "how to implement a distributed system"]
+suggest_queries = ["c", "comp", "machine lear", "dictionery", "informaton retreival systms"]    # Prefixes and typos for /suggest
+
+cold_runs = 5       # Number of fresh Python processes started to measure cold start
+warm_runs = 20      # Number of times each query is repeated in an already warm process
+
+
+# Runs inside a brand new interpreter: imports search, answers one query, and reports how long each step took
+cold_start_script = """
+import sys, time, json
+time_start = time.perf_counter()
+from search import search
+time_imported = time.perf_counter()
+search(sys.argv[1], sys.argv[2])
+time_first_result = time.perf_counter()
+print(json.dumps({"import": (time_imported - time_start) * 1000, "first_query": (time_first_result - time_imported) * 1000}))
+"""
+
+# Same, but for a Flask worker: imports app.py (Flask, flask_cors, dotenv, requests, search, suggest) and serves one /search request
+flask_cold_start_script = """
+import sys, time, json
+time_start = time.perf_counter()
+import app
+time_imported = time.perf_counter()
+app.dir = sys.argv[2]
+response = app.app.test_client().get("/search", query_string={"q": sys.argv[1]})
+assert response.status_code == 200, response.status_code
+time_first_result = time.perf_counter()
+print(json.dumps({"import": (time_imported - time_start) * 1000, "first_query": (time_first_result - time_imported) * 1000}))
+"""
+
+
+def measure_cold_start(query, final_dir, script=cold_start_script):
+    # Starts a fresh Python process that imports search.py (or app.py) and answers a single query
+    # The total includes starting the interpreter itself, so it is what a new process pays before its first result
+    # INPUT:
+    #   - query: the query to answer
+    #   - final_dir: where alphabetical indexes are stored
+    #   - script: cold_start_script for search.py alone, flask_cold_start_script for a Flask worker
+    # OUTPUT: a dictionary of timings in ms (total, import, first_query)
+
+    time_start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", script, query, final_dir], capture_output=True, text=True, check=True)
+    time_end = time.perf_counter()
+
+    timings = json.loads(output.stdout.strip().splitlines()[-1])
+    timings["total"] = (time_end - time_start) * 1000
+
+    return timings
+
+
+def measure_warm_queries(queries, final_dir, runs):
+    # Answers each query repeatedly in this process, after the first run has loaded everything
+    # INPUT:
+    #   - queries: list of queries
+    #   - final_dir: where alphabetical indexes are stored
+    #   - runs: how many times to repeat each query
+    # OUTPUT: (query : list of timings in ms)
+
+    from search import search
+
+    timings = {}
+    for query in queries:
+        search(query, final_dir)
+        timings[query] = []
+        for _ in range(runs):
+            time_start = time.perf_counter()
+            search(query, final_dir)
+            timings[query].append((time.perf_counter() - time_start) * 1000)
+
+    return timings
+
+
+def measure_suggestions(queries, final_dir, runs):
+    # Runs each /suggest query repeatedly in this process, after the first run has mapped lexicon.bin
+    # INPUT:
+    #   - queries: list of partially typed or misspelled queries
+    #   - final_dir: where alphabetical indexes are stored
+    #   - runs: how many times to repeat each query
+    # OUTPUT: (query : list of timings in ms)
+
+    from suggest import suggest
+
+    timings = {}
+    for query in queries:
+        suggest(query, final_dir)
+        timings[query] = []
+        for _ in range(runs):
+            time_start = time.perf_counter()
+            suggest(query, final_dir)
+            timings[query].append((time.perf_counter() - time_start) * 1000)
+
+    return timings
+
+
+def run_benchmark(queries, final_dir):
+    # Prints cold start and warm query timings
+
+    global cold_runs, warm_runs
+
+    for name, script in [("search.py", cold_start_script), ("Flask worker (app.py, /search)", flask_cold_start_script)]:
+        print(f"Cold start to first result, {name} ({cold_runs} fresh processes per query)")
+
+        try:
+            for query in queries:
+                runs = [measure_cold_start(query, final_dir, script) for _ in range(cold_runs)]
+                total = statistics.median(run["total"] for run in runs)
+                imported = statistics.median(run["import"] for run in runs)
+                first_query = statistics.median(run["first_query"] for run in runs)
+                print(f"  {query!r}: {total:.3f} ms median (import {imported:.3f} ms, first query {first_query:.3f} ms)")
+        except subprocess.CalledProcessError as e:
+            print(f"  Could not run: {e.stderr.strip().splitlines()[-1] if e.stderr.strip() else e}")
+        print()
+
+    print(f"Warm queries ({warm_runs} runs per query)")
+    for query, timings in measure_warm_queries(queries, final_dir, warm_runs).items():
+        print(f"  {query!r}: {statistics.median(timings):.3f} ms median, {max(timings):.3f} ms max")
+    print()
+
+    print(f"Suggestions ({warm_runs} runs per query)")
+    for query, timings in measure_suggestions(suggest_queries, final_dir, warm_runs).items():
+        print(f"  {query!r}: {statistics.median(timings):.3f} ms median, {max(timings):.3f} ms max")
+
+
+if __name__ == "__main__":
+    run_benchmark(sys.argv[1:] or queries, final_dir)
@@ -56,7 +56,9 @@ from pathlib import Path
 from nltk.tokenize import word_tokenize # type: ignore
 from nltk.stem import PorterStemmer     # type: ignore 
 from bs4 import BeautifulSoup
-from collections import defaultdict
+from collections import defaultdict, Counter
+from lexicon import write_lexicon
+from manifest import write_manifest
 
 documentCount = 0                                       # Records number of unique documents parsed through
 dev_path = "./DEV/"                                     # Path to the local, UNZIPPED DEV folder
@@ -65,6 +67,7 @@ final_dir = "./index/"                                  # Where completed indexe
 final_index = defaultdict(lambda: defaultdict(int))     # Complete inverted index storing (token : (document : count))
 batch_size = 1000                                       # Maximum number of iterated-through *.json file before we save to disk
 alphabetical_chunk_size = 500                           # Number of terms in each alphabetical terms_X.pkl file
+surface_counts = defaultdict(Counter)                   # (stem : (lowercase word : count)), picks the word /suggest shows for each stem
 
 
 def save_partial_inverted_index(inverted_index, filename):
@@ -103,7 +106,7 @@ def merge_partial_indexes(output_dir, final_dir, filename_format, num_partial_in
     #   - final_dir: a path to save the combined index
     #   - filename_format: adds the 0,1,2,... to the end of the saved index
     #   - num_partial_indexes: number of created partial indexes we need to combine
-    # OUTPUT: a final inverted index
+    # OUTPUT: a final inverted index, and (term : terms_*.pkl file it was saved in) for the lexicon
 
     global final_index
 
@@ -118,10 +121,12 @@ def merge_partial_indexes(output_dir, final_dir, filename_format, num_partial_in
                 final_index[token][doc_id] += count     # Add to final index (token : (doc_id : count += count))
 
     # Save to disk
-    split_final_index_alphabetically(final_index, final_dir)
+    term_chunks = split_final_index_alphabetically(final_index, final_dir)
     save_partial_inverted_index(final_index, os.path.join(final_dir, "final_inverted_index.pkl"))
     print("Final inverted index saved.")
 
+    return term_chunks
+
 
 def process_files(dev_path, output_dir, final_dir):
     # INPUT:
@@ -170,8 +175,11 @@ def process_files(dev_path, output_dir, final_dir):
     
     # After all .json files parsed and PIIs created, merge all PIIs together as a single inverted index
     print("\nAll partially inverted indexes saved. Now merging...")
-    merge_partial_indexes(output_dir, final_dir, partial_index_filename_format, partial_index_counter)
+    term_chunks = merge_partial_indexes(output_dir, final_dir, partial_index_filename_format, partial_index_counter)
     write_total_documents(final_dir, documentCount)
+    surface_forms = {stem: counts.most_common(1)[0][0] for stem, counts in surface_counts.items()}
+    write_lexicon(term_chunks, final_index, documentCount, surface_forms, final_dir)
+    write_manifest(final_dir, documentCount)
         
 
 def parser(content):
@@ -200,6 +208,10 @@ def parser(content):
         stems = [stemmer.stem(word) for word in tokens]
         number_tokens_after_stemming = len(set(stems))
 
+        # Remember which words each stem came from
+        for word, stem in zip(tokens, stems):
+            surface_counts[stem][word.lower()] += 1
+
         # Extract bolded text
         bold_texts = [bolded.get_text(strip = True) for bolded in soup.find_all(["b", "strong"])]
         bold_texts = word_tokenize(" ".join(bold_texts))
@@ -248,7 +260,7 @@ def parser(content):
 
 def split_final_index_alphabetically(final_index, final_dir):
     # INPUT: final inverted index dictionary object, where to store it
-    # OUTPUT: the final inverted index split alphabetically
+    # OUTPUT: the final inverted index split alphabetically, returns (term : terms_*.pkl file it was saved in)
     # Ex.   final_index = {
     #           "ant": {"doc1.json": 2, "doc2.json": 1}, 
     #           "both": {"doc1.json": 2}, 
@@ -266,6 +278,7 @@ def split_final_index_alphabetically(final_index, final_dir):
 
     split_final = defaultdict(dict)
     lookup_dict = defaultdict(dict)
+    term_chunks = {}
 
     # Iterate through final index where token = "ant", doc_map = {"doc1.json": 2, "doc2.json": 1}
     for token, doc_map in final_index.items():
@@ -284,6 +297,7 @@ def split_final_index_alphabetically(final_index, final_dir):
         if num_chunks <= 1:
             filename = os.path.join(final_dir, f"terms_{letter}.pkl")
             save_partial_inverted_index(terms, filename)
+            term_chunks.update((term, filename) for term in terms)
 
             # Add last term to lookup dictionary
             if terms_list:
@@ -301,6 +315,7 @@ def split_final_index_alphabetically(final_index, final_dir):
                 # Save chunk to disk
                 chunk_filename = os.path.join(final_dir, f"terms_{letter}P{i+1}.pkl")
                 save_partial_inverted_index(chunk_dict, chunk_filename)
+                term_chunks.update((term, chunk_filename) for term in chunk_dict)
 
                 # Add last term to lookup dictionary
                 if chunk_list:
@@ -315,6 +330,8 @@ def split_final_index_alphabetically(final_index, final_dir):
         save_partial_inverted_index(lookup_dict, lookup_dictionary_path)
 
     print("Final index successfully split alphabetically.")
+
+    return term_chunks
     
 
 def write_total_documents(final_dir, documentCount):
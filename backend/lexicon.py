@@ -0,0 +1,332 @@
+''' Prebuilt lexicon snapshot
+
+    A single binary file (index/lexicon.bin) holding the whole index vocabulary, along with each term's
+    document frequency, terms_*.pkl file and surface form, so lookups never need to unpickle any key_*.pkl files.
+
+    The index only stores stems ("comput"), so the surface form is the word that stem was most often
+    written as on the crawled pages ("computer"). That is what /suggest shows to users.
+
+    FILE LAYOUT (all integers are 4-byte unsigned ints in the machine's native byte order, so a lexicon.bin
+    built on a big-endian machine has to be rebuilt with 'python lexicon.py' on a little-endian one):
+        - header: magic "LEX2", number of terms, number of chunk files, number of documents, number of prefixes
+        - offsets: (number of terms + 1) absolute byte offsets into the term bytes
+        - dfs: document frequency of each term
+        - chunk_ids: which terms_*.pkl file each term is stored in
+        - surface_offsets: (number of terms + 1) absolute byte offsets into the surface bytes
+        - prefix keys: every prefix of up to top_terms_prefix_length bytes that a term starts with, sorted (see prefix_key)
+        - top terms: for each prefix, the positions of its top_terms_per_prefix terms with the highest df (padded with no_term)
+        - term bytes: every term encoded as utf-8, sorted, back to back
+        - surface bytes: each term's surface form as utf-8, left empty when it is the same as the term
+        - chunk names: the terms_*.pkl filenames joined by newlines
+
+    The file is opened with mmap, so loading it only reads the header; the operating system pages in
+    the parts binary searches actually touch. Terms are compared as utf-8 bytes, which sort in the
+    same order as Python strings.
+
+    lexicon.bin is never rewritten in place: a new one is written to lexicon.bin.tmp and renamed over the old one,
+    so workers that already mapped the old file keep reading it instead of crashing. Each worker maps lexicon.bin
+    once and never checks it again, so workers must be restarted to see a new snapshot.
+'''
+
+import os
+import mmap
+import time
+import pickle
+import heapq
+import struct
+from array import array
+from bisect import bisect_left
+from itertools import groupby
+
+# CHANGE THIS TO WHERE PARTIAL ALPHABETICAL INDEXES ARE STORED
+final_dir = "./index/"
+
+lexicon_filename = "lexicon.bin"    # Written next to the terms_*.pkl files
+surface_forms_filename = "surface_forms.pkl"    # (stem : surface form), kept so 'python lexicon.py' can rebuild lexicon.bin with them
+header_format = "=4sIIII"           # magic, number of terms, number of chunk files, number of documents, number of prefixes (native order, like the arrays)
+header_magic = b"LEX2"
+top_terms_prefix_length = 3         # Most popular terms are precomputed for prefixes up to this many bytes, so short prefixes never scan their whole range
+top_terms_per_prefix = 10           # How many terms are kept per prefix, twice suggestion_count in suggest.py
+no_term = 0xFFFFFFFF                # Pads the top terms of prefixes with fewer than top_terms_per_prefix terms
+_lexicon_cache = {}                 # (final_dir : lexicon) so each worker only maps lexicon.bin once, never invalidated
+
+
+class MappedTerms:
+    # Read-only sequence of the terms in a mapped lexicon.bin, as utf-8 bytes
+    # Only implements what bisect needs (len and indexing), so no term is decoded unless it is looked at
+
+    def __init__(self, buffer, offsets):
+        self.buffer = buffer
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.buffer[self.offsets[i] : self.offsets[i + 1]]
+
+
+def replace_file(filename, parts):
+    # Writes a file next to filename and then renames it over filename
+    # Processes that mapped the old file keep the old data, while truncating a mapped file kills them with a bus error
+    # INPUT:
+    #   - filename: the file to replace
+    #   - parts: the new contents, as a list of bytes
+    # OUTPUT: filename holding the new contents
+
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, "wb") as file:
+        for part in parts:
+            file.write(part)
+
+    os.replace(temp_filename, filename)
+
+
+def write_lexicon(term_chunks, final_index, num_documents, surface_forms, final_dir):
+    # Saves the lexicon snapshot of a complete inverted index
+    # INPUT:
+    #   - term_chunks: (term : terms_*.pkl filename it was saved in), from split_final_index_alphabetically
+    #   - final_index: the complete inverted index (token : (document : count)), used for document frequencies
+    #   - num_documents: total number of documents in the corpus
+    #   - surface_forms: (stem : most common word it was stemmed from)
+    #   - final_dir: where alphabetical indexes are stored
+    # OUTPUT: lexicon.bin and surface_forms.pkl saved in final_dir
+
+    os.makedirs(final_dir, exist_ok = True)
+    replace_file(os.path.join(final_dir, surface_forms_filename), [pickle.dumps(surface_forms)])
+
+    entries = [(term, len(final_index[term]), chunk_filename, surface_forms.get(term, term)) for term, chunk_filename in term_chunks.items()]
+    save_lexicon(entries, num_documents, final_dir)
+
+
+def prefix_key(prefix):
+    # Packs a prefix of up to top_terms_prefix_length bytes into an int, padded with zero bytes (which never appear in a term)
+    # Ex. b"co" -> 0x636F00, b"com" -> 0x636F6D, so keys sort in the same order as the prefixes
+    # INPUT: a utf-8 encoded prefix
+    # OUTPUT: the prefix's key
+
+    return int.from_bytes(prefix.ljust(top_terms_prefix_length, b"\0"), "big")
+
+
+def find_top_terms(encoded):
+    # Finds the top_terms_per_prefix terms with the highest df under every prefix of up to top_terms_prefix_length bytes
+    # Terms are sorted, so each prefix's terms are next to each other and can be grouped in one pass
+    # INPUT: encoded: sorted list of (term, df, chunk name, surface) as utf-8
+    # OUTPUT: (prefix_keys, top_terms) arrays, where top_terms[k * top_terms_per_prefix : (k + 1) * top_terms_per_prefix] belongs to prefix_keys[k]
+
+    top = {}
+    for length in range(1, top_terms_prefix_length + 1):
+        positions = (i for i in range(len(encoded)) if len(encoded[i][0]) >= length)
+        for prefix, group in groupby(positions, key=lambda i: encoded[i][0][:length]):
+            best = heapq.nlargest(top_terms_per_prefix, group, key=lambda i: encoded[i][1])
+            top[prefix_key(prefix)] = best + [no_term] * (top_terms_per_prefix - len(best))
+
+    prefix_keys = array("I", sorted(top))
+    top_terms = array("I", (i for key in prefix_keys for i in top[key]))
+
+    return prefix_keys, top_terms
+
+
+def save_lexicon(entries, num_documents, final_dir):
+    # Lays out and writes lexicon.bin
+    # INPUT:
+    #   - entries: a list of (term, df, terms_*.pkl filename, surface form), in any order
+    #   - num_documents: total number of documents in the corpus
+    #   - final_dir: where alphabetical indexes are stored
+    # OUTPUT: lexicon.bin saved in final_dir
+
+    encoded = sorted(
+        (term.encode("utf-8"), df, os.path.basename(chunk_filename), b"" if surface == term else surface.encode("utf-8"))
+        for term, df, chunk_filename, surface in entries
+    )
+
+    chunk_names = sorted({chunk_name for _, _, chunk_name, _ in encoded})
+    chunk_lookup = {chunk_name: i for i, chunk_name in enumerate(chunk_names)}
+
+    prefix_keys, top_terms = find_top_terms(encoded)
+
+    num_terms = len(encoded)
+    term_start = struct.calcsize(header_format) + 4 * (num_terms + 1) * 2 + 4 * num_terms * 2 + 4 * (len(prefix_keys) + len(top_terms))
+
+    # Absolute offsets of every term, plus one past the last term
+    offsets = array("I", [term_start])
+    for term, _, _, _ in encoded:
+        offsets.append(offsets[-1] + len(term))
+
+    # Surface forms come right after the terms
+    surface_offsets = array("I", [offsets[-1]])
+    for _, _, _, surface in encoded:
+        surface_offsets.append(surface_offsets[-1] + len(surface))
+
+    dfs = array("I", (df for _, df, _, _ in encoded))
+    chunk_ids = array("I", (chunk_lookup[chunk_name] for _, _, chunk_name, _ in encoded))
+
+    os.makedirs(final_dir, exist_ok = True)
+    replace_file(os.path.join(final_dir, lexicon_filename), [
+        struct.pack(header_format, header_magic, num_terms, len(chunk_names), num_documents, len(prefix_keys)),
+        offsets.tobytes(),
+        dfs.tobytes(),
+        chunk_ids.tobytes(),
+        surface_offsets.tobytes(),
+        prefix_keys.tobytes(),
+        top_terms.tobytes(),
+        b"".join(term for term, _, _, _ in encoded),
+        b"".join(surface for _, _, _, surface in encoded),
+        "\n".join(chunk_names).encode("utf-8"),
+    ])
+
+
+def rebuild_lexicon_from_chunks(final_dir):
+    # Builds lexicon.bin for an index created before the indexer wrote one
+    # Goes through every terms_*.pkl listed in the key_*.pkl files one chunk at a time, so the full index is never in memory
+    # Surface forms come from surface_forms.pkl if the indexer wrote one, otherwise every term is shown as itself
+    # INPUT: final_dir: where alphabetical indexes are stored
+    # OUTPUT: lexicon.bin saved in final_dir
+
+    surface_forms = {}
+    surface_forms_path = os.path.join(final_dir, surface_forms_filename)
+    if os.path.exists(surface_forms_path):
+        with open(surface_forms_path, "rb") as file:
+            surface_forms = pickle.load(file)
+
+    entries = []
+    for filename in sorted(os.listdir(final_dir)):
+        if not (filename.startswith("key_") and filename.endswith(".pkl")):
+            continue
+
+        with open(os.path.join(final_dir, filename), "rb") as file:
+            lookup_dict = pickle.load(file)
+
+        for chunk_filename in set(lookup_dict.values()):
+            with open(os.path.join(final_dir, os.path.basename(chunk_filename)), "rb") as file:
+                chunk_data = pickle.load(file)
+            entries.extend((term, len(doc_map), chunk_filename, surface_forms.get(term, term)) for term, doc_map in chunk_data.items())
+
+    with open(os.path.join(final_dir, "total_documents.pkl"), "rb") as file:
+        num_documents = pickle.load(file)
+
+    save_lexicon(entries, num_documents, final_dir)
+
+
+def load_lexicon(final_dir):
+    # Maps lexicon.bin once per process and keeps it open
+    # INPUT: final_dir: where alphabetical indexes are stored
+    # OUTPUT: the lexicon from map_lexicon, shared by every later call
+
+    if final_dir not in _lexicon_cache:
+        _lexicon_cache[final_dir] = map_lexicon(final_dir)
+
+    return _lexicon_cache[final_dir]
+
+
+def map_lexicon(final_dir):
+    # Maps the current lexicon.bin, without going through the cache (manifest.py uses this to check what is on disk)
+    # INPUT: final_dir: where alphabetical indexes are stored
+    # OUTPUT: a dictionary with
+    #   - terms: MappedTerms over every term (utf-8 bytes, sorted)
+    #   - surfaces: MappedTerms over each term's surface form (empty when it is the term itself), see surface_form
+    #   - dfs, chunk_ids: parallel to terms
+    #   - prefix_keys, top_terms: the most popular terms under each short prefix, see find_top_terms
+    #   - chunk_files: full path of each terms_*.pkl file, indexed by chunk id
+    #   - num_documents: total number of documents in the corpus
+
+    with open(os.path.join(final_dir, lexicon_filename), "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, num_terms, num_chunks, num_documents, num_prefixes = struct.unpack_from(header_format, buffer)
+    if magic != header_magic:
+        raise ValueError(f"{lexicon_filename} in {final_dir} is not a lexicon snapshot, or is an older one. Run 'python lexicon.py' to rebuild it.")
+
+    # Slice the arrays straight out of the mapping, nothing is copied
+    view = memoryview(buffer)
+    start = struct.calcsize(header_format)
+    offsets = view[start : start + 4 * (num_terms + 1)].cast("I")
+    start += 4 * (num_terms + 1)
+    dfs = view[start : start + 4 * num_terms].cast("I")
+    start += 4 * num_terms
+    chunk_ids = view[start : start + 4 * num_terms].cast("I")
+    start += 4 * num_terms
+    surface_offsets = view[start : start + 4 * (num_terms + 1)].cast("I")
+    start += 4 * (num_terms + 1)
+    prefix_keys = view[start : start + 4 * num_prefixes].cast("I")
+    start += 4 * num_prefixes
+    top_terms = view[start : start + 4 * num_prefixes * top_terms_per_prefix].cast("I")
+
+    chunk_names = buffer[surface_offsets[-1]:].decode("utf-8").split("\n") if num_chunks else []
+
+    return {
+        "terms": MappedTerms(buffer, offsets),
+        "surfaces": MappedTerms(buffer, surface_offsets),
+        "dfs": dfs,
+        "chunk_ids": chunk_ids,
+        "prefix_keys": prefix_keys,
+        "top_terms": top_terms,
+        "chunk_files": [os.path.join(final_dir, chunk_name) for chunk_name in chunk_names],
+        "num_documents": num_documents,
+    }
+
+
+def find_term(term, lexicon):
+    # Binary search for an exact term in the lexicon
+    # INPUT:
+    #   - term: the term as a string
+    #   - lexicon: from load_lexicon
+    # OUTPUT: the term's position in the lexicon, or None if it is not part of the index vocabulary
+
+    terms = lexicon["terms"]
+    key = term.encode("utf-8")
+    i = bisect_left(terms, key)
+
+    if i < len(terms) and terms[i] == key:
+        return i
+    return None
+
+
+def top_terms_for_prefix(prefix, lexicon):
+    # Looks up the precomputed most popular terms under a short prefix
+    # INPUT:
+    #   - prefix: a utf-8 encoded prefix
+    #   - lexicon: from load_lexicon
+    # OUTPUT: positions of up to top_terms_per_prefix terms starting with prefix, highest df first,
+    #         or None if prefix is longer than top_terms_prefix_length (and its range has to be scanned instead)
+
+    if len(prefix) > top_terms_prefix_length:
+        return None
+
+    prefix_keys = lexicon["prefix_keys"]
+    key = prefix_key(prefix)
+    k = bisect_left(prefix_keys, key)
+    if k == len(prefix_keys) or prefix_keys[k] != key:
+        return []
+
+    top_terms = lexicon["top_terms"][k * top_terms_per_prefix : (k + 1) * top_terms_per_prefix]
+    return [i for i in top_terms if i != no_term]
+
+
+def surface_form(i, lexicon):
+    # INPUT:
+    #   - i: a term's position in the lexicon
+    #   - lexicon: from load_lexicon
+    # OUTPUT: the word to show users for that term, as a string
+
+    surface = lexicon["surfaces"][i] or lexicon["terms"][i]
+    return surface.decode("utf-8")
+
+
+if __name__ == "__main__":
+    # Builds lexicon.bin from an existing index, then times mapping it
+
+    time_start = time.perf_counter()
+    rebuild_lexicon_from_chunks(final_dir)
+    time_end = time.perf_counter()
+    print(f"Built {lexicon_filename} in {(time_end - time_start) * 1000:.3f} ms")
+
+    # lexicon.bin changed, so an existing manifest would no longer validate
+    from manifest import write_manifest, read_total_documents, manifest_filename
+    if os.path.exists(os.path.join(final_dir, manifest_filename)):
+        write_manifest(final_dir, read_total_documents(final_dir))
+
+    time_start = time.perf_counter()
+    lexicon = load_lexicon(final_dir)
+    time_end = time.perf_counter()
+    print(f"Loaded {len(lexicon['terms'])} terms in {(time_end - time_start) * 1000:.3f} ms")
@@ -0,0 +1,344 @@
+''' Index manifest and validation
+
+    indexer.py finishes by writing index/manifest.json, which records:
+        - build_id: a hash of every file's checksum, so two identical builds share an ID
+        - num_documents, num_terms, num_postings, num_chunks
+        - df_histogram: how many terms appear in 1, 2-3, 4-7, 8-15, ... documents
+        - files: the size and sha256 of every other file in the index folder
+
+    'python manifest.py --write [index folder]' writes a new manifest for an existing index, e.g. after 'python lexicon.py'
+    (which does this itself when a manifest already exists).
+
+    Running 'python manifest.py [index folder]' checks an index against its manifest before it is deployed:
+        1) every file in the manifest exists with the same size and checksum, and no extra files exist
+        2) every terms_*.pkl referenced in a key_*.pkl exists, and none are left unreferenced
+        3) chunk boundaries are sorted: each chunk only holds terms between the previous chunk's last term and its own
+        4) lexicon.bin agrees with the chunks on every term's document frequency and terms_*.pkl file
+        5) term/posting counts and the df histogram match the manifest
+    Only one terms_*.pkl file is loaded at a time, so validating never needs the whole index in memory.
+    Exits with status 1 if anything is wrong.
+'''
+
+import os
+import sys
+import json
+import time
+import pickle
+import hashlib
+import argparse
+from collections import Counter
+from lexicon import map_lexicon, find_term, lexicon_filename
+
+# CHANGE THIS TO WHERE PARTIAL ALPHABETICAL INDEXES ARE STORED
+final_dir = "./index/"
+
+manifest_filename = "manifest.json"
+checksum_block_size = 1 << 20       # Files are hashed 1 MB at a time
+
+# Every field manifest.json must have, and its type
+manifest_fields = {
+    "build_id": str,
+    "created": str,
+    "num_documents": int,
+    "num_terms": int,
+    "num_postings": int,
+    "num_chunks": int,
+    "df_histogram": dict,
+    "files": dict,
+}
+
+
+def file_checksum(filename):
+    # INPUT: a file on disk
+    # OUTPUT: its sha256 as a hex string, read in blocks so large files are never fully in memory
+
+    sha256 = hashlib.sha256()
+    with open(filename, "rb") as file:
+        for block in iter(lambda: file.read(checksum_block_size), b""):
+            sha256.update(block)
+
+    return sha256.hexdigest()
+
+
+def df_bucket(df):
+    # Groups a document frequency into a power-of-two bucket for the histogram
+    # Ex. 1 -> "1", 2 -> "2-3", 5 -> "4-7", 100 -> "64-127"
+    # INPUT: a term's document frequency
+    # OUTPUT: the bucket label
+
+    low = 1 << (df.bit_length() - 1)
+    high = (low << 1) - 1
+
+    return str(low) if low == high else f"{low}-{high}"
+
+
+def scan_index(final_dir, check_lexicon):
+    # Streams through every key_*.pkl and the terms_*.pkl files it references, one chunk at a time
+    # INPUT:
+    #   - final_dir: where alphabetical indexes are stored
+    #   - check_lexicon: whether to compare every term with lexicon.bin
+    # OUTPUT: (stats, errors)
+    #   - stats: a dictionary of num_terms, num_postings, num_chunks, max_df, df_histogram
+    #   - errors: list of problems found
+
+    errors = []
+    df_histogram = Counter()
+    num_terms = 0
+    num_postings = 0
+    max_df = 0
+    referenced_chunks = set()
+
+    lexicon = map_lexicon(final_dir) if check_lexicon else None
+
+    key_files = sorted(filename for filename in os.listdir(final_dir) if filename.startswith("key_") and filename.endswith(".pkl"))
+
+    for key_file in key_files:
+        letter = key_file[len("key_") : -len(".pkl")]
+
+        with open(os.path.join(final_dir, key_file), "rb") as file:
+            lookup_dict = pickle.load(file)
+
+        # Chunks are searched in order of their last term, so each chunk must only hold terms after the previous chunk's last term
+        previous_last_term = None
+        for last_term, chunk_filename in sorted(lookup_dict.items()):
+            chunk_name = os.path.basename(chunk_filename)
+            chunk_path = os.path.join(final_dir, chunk_name)
+            referenced_chunks.add(chunk_name)
+
+            if not os.path.exists(chunk_path):
+                errors.append(f"{key_file}: {chunk_name} (last term {last_term!r}) does not exist")
+                previous_last_term = last_term
+                continue
+
+            with open(chunk_path, "rb") as file:
+                chunk_data = pickle.load(file)
+
+            if not chunk_data:
+                errors.append(f"{chunk_name}: chunk is empty")
+            else:
+                if max(chunk_data) != last_term:
+                    errors.append(f"{chunk_name}: last term is {max(chunk_data)!r} but {key_file} says {last_term!r}")
+                if previous_last_term is not None and min(chunk_data) <= previous_last_term:
+                    errors.append(f"{chunk_name}: first term {min(chunk_data)!r} is not after the previous chunk's last term {previous_last_term!r}")
+
+            for term, doc_map in chunk_data.items():
+                df = len(doc_map)
+
+                if term[0].upper() != letter:
+                    errors.append(f"{chunk_name}: term {term!r} does not belong under {key_file}")
+                if df == 0:
+                    errors.append(f"{chunk_name}: term {term!r} has no postings")
+                else:
+                    df_histogram[df_bucket(df)] += 1
+
+                num_terms += 1
+                num_postings += df
+                max_df = max(max_df, df)
+
+                # Compare with lexicon.bin, which search uses to pick the chunk
+                if lexicon is not None:
+                    i = find_term(term, lexicon)
+                    if i is None:
+                        errors.append(f"{lexicon_filename}: missing term {term!r}")
+                    elif lexicon["dfs"][i] != df:
+                        errors.append(f"{lexicon_filename}: term {term!r} has df {lexicon['dfs'][i]} but {chunk_name} has {df}")
+                    elif os.path.basename(lexicon["chunk_files"][lexicon["chunk_ids"][i]]) != chunk_name:
+                        errors.append(f"{lexicon_filename}: term {term!r} points to the wrong chunk instead of {chunk_name}")
+
+            previous_last_term = last_term
+
+    # terms_*.pkl files no key file points at can never be searched
+    for filename in sorted(os.listdir(final_dir)):
+        if filename.startswith("terms_") and filename.endswith(".pkl") and filename not in referenced_chunks:
+            errors.append(f"{filename}: not referenced by any key file")
+
+    if lexicon is not None and len(lexicon["terms"]) != num_terms:
+        errors.append(f"{lexicon_filename}: has {len(lexicon['terms'])} terms but the chunks have {num_terms}")
+
+    stats = {
+        "num_terms": num_terms,
+        "num_postings": num_postings,
+        "num_chunks": len(referenced_chunks),
+        "max_df": max_df,
+        "df_histogram": dict(sorted(df_histogram.items(), key=lambda x: int(x[0].split("-")[0]))),
+    }
+
+    return stats, errors
+
+
+def check_manifest_fields(manifest):
+    # Makes sure a loaded manifest.json has every field validate_index reads, with the right types
+    # INPUT: the parsed manifest.json
+    # OUTPUT: list of problems found
+
+    if not isinstance(manifest, dict):
+        return [f"{manifest_filename} is not a JSON object"]
+
+    errors = []
+    for field, field_type in manifest_fields.items():
+        if field not in manifest:
+            errors.append(f"{manifest_filename} is missing {field!r}")
+        elif not isinstance(manifest[field], field_type) or isinstance(manifest[field], bool):
+            errors.append(f"{manifest_filename}: {field!r} should be a {field_type.__name__}")
+
+    files = manifest.get("files")
+    if isinstance(files, dict):
+        for filename, info in files.items():
+            if not (isinstance(info, dict) and isinstance(info.get("size"), int) and isinstance(info.get("sha256"), str)):
+                errors.append(f"{manifest_filename}: entry for {filename} needs an integer 'size' and a string 'sha256'")
+
+    return errors
+
+
+def read_total_documents(final_dir):
+    # INPUT: final_dir: where alphabetical indexes are stored
+    # OUTPUT: total number of documents in the corpus, from total_documents.pkl (written by indexer.py)
+
+    with open(os.path.join(final_dir, "total_documents.pkl"), "rb") as file:
+        return pickle.load(file)
+
+
+def write_manifest(final_dir, num_documents):
+    # Writes manifest.json for a freshly built index
+    # Called by indexer.py after every other file in final_dir has been saved
+    # INPUT:
+    #   - final_dir: where alphabetical indexes are stored
+    #   - num_documents: total number of documents in the corpus
+    # OUTPUT: manifest.json saved in final_dir
+
+    stats, errors = scan_index(final_dir, check_lexicon=False)
+    for error in errors:
+        print(f"Warning: {error}")
+
+    files = {}
+    for filename in sorted(os.listdir(final_dir)):
+        if filename == manifest_filename:
+            continue
+        path = os.path.join(final_dir, filename)
+        files[filename] = {"size": os.path.getsize(path), "sha256": file_checksum(path)}
+
+    # Same files -> same build ID
+    build_hash = hashlib.sha256()
+    for filename, info in files.items():
+        build_hash.update(f"{filename}:{info['sha256']}\n".encode("utf-8"))
+
+    manifest = {
+        "build_id": build_hash.hexdigest()[:16],
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "num_documents": num_documents,
+        "num_terms": stats["num_terms"],
+        "num_postings": stats["num_postings"],
+        "num_chunks": stats["num_chunks"],
+        "df_histogram": stats["df_histogram"],
+        "files": files,
+    }
+
+    with open(os.path.join(final_dir, manifest_filename), "w") as file:
+        json.dump(manifest, file, indent=2)
+
+    print(f"Manifest saved with build ID {manifest['build_id']}.")
+    return manifest
+
+
+def validate_index(final_dir, verify_checksums=True):
+    # Checks an index against its manifest and its own structure
+    # INPUT:
+    #   - final_dir: where alphabetical indexes are stored
+    #   - verify_checksums: whether to re-hash every file (slowest part, file sizes are still compared when False)
+    # OUTPUT: (manifest, stats, errors)
+
+    errors = []
+
+    manifest_path = os.path.join(final_dir, manifest_filename)
+    if not os.path.exists(manifest_path):
+        return None, None, [f"{manifest_filename} does not exist in {final_dir}"]
+
+    try:
+        with open(manifest_path, "r") as file:
+            manifest = json.load(file)
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        return None, None, [f"{manifest_filename} could not be read: {e}"]
+
+    errors = check_manifest_fields(manifest)
+    if errors:
+        return None, None, errors
+
+    # Files on disk vs. files in the manifest
+    on_disk = set(os.listdir(final_dir)) - {manifest_filename}
+    for filename in sorted(on_disk - set(manifest["files"])):
+        errors.append(f"{filename}: not listed in {manifest_filename}")
+
+    for filename, info in manifest["files"].items():
+        path = os.path.join(final_dir, filename)
+        if filename not in on_disk:
+            errors.append(f"{filename}: listed in {manifest_filename} but missing")
+        elif os.path.getsize(path) != info["size"]:
+            errors.append(f"{filename}: size is {os.path.getsize(path)} bytes, expected {info['size']}")
+        elif verify_checksums and file_checksum(path) != info["sha256"]:
+            errors.append(f"{filename}: checksum does not match")
+
+    # Structure of the key/terms files and lexicon.bin
+    check_lexicon = lexicon_filename in on_disk
+    if not check_lexicon:
+        errors.append(f"{lexicon_filename} does not exist")
+
+    try:
+        stats, scan_errors = scan_index(final_dir, check_lexicon)
+    except Exception as e:
+        return manifest, None, errors + [f"Could not read index: {e}"]
+    errors.extend(scan_errors)
+
+    # Counts vs. the manifest
+    for field in ["num_terms", "num_postings", "num_chunks", "df_histogram"]:
+        if stats[field] != manifest[field]:
+            errors.append(f"{field} is {stats[field]}, {manifest_filename} says {manifest[field]}")
+
+    if check_lexicon and map_lexicon(final_dir)["num_documents"] != manifest["num_documents"]:
+        errors.append(f"{lexicon_filename} has a different document count than {manifest_filename}")
+    if stats["max_df"] > manifest["num_documents"]:
+        errors.append(f"a term appears in {stats['max_df']} documents but there are only {manifest['num_documents']}")
+
+    return manifest, stats, errors
+
+
+def print_summary(manifest, stats):
+    # Prints the build and its postings-length (df) distribution
+
+    print(f"Build ID: {manifest['build_id']} (created {manifest['created']})")
+    print(f"Documents: {manifest['num_documents']}")
+    print(f"Terms: {stats['num_terms']} in {stats['num_chunks']} chunks")
+    print(f"Postings: {stats['num_postings']} (average {stats['num_postings'] / max(stats['num_terms'], 1):.2f} per term, max {stats['max_df']})")
+    print(f"Index size on disk: {sum(info['size'] for info in manifest['files'].values()) / 1000} kilobytes")
+
+    print("\nTerms by number of documents (df):")
+    width = max((len(bucket) for bucket in stats["df_histogram"]), default=0)
+    for bucket, count in stats["df_histogram"].items():
+        print(f"  {bucket:>{width}}: {count}")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Validate and summarize an index built by indexer.py")
+    arg_parser.add_argument("index_dir", nargs="?", default=final_dir, help="folder holding the index (default: ./index/)")
+    arg_parser.add_argument("--skip-checksums", action="store_true", help="only compare file sizes instead of re-hashing every file")
+    arg_parser.add_argument("--write", action="store_true", help="write a new manifest.json for the index as it is now, then validate it")
+    args = arg_parser.parse_args()
+
+    if args.write:
+        write_manifest(args.index_dir, read_total_documents(args.index_dir))
+
+    time_start = time.perf_counter()
+    manifest, stats, errors = validate_index(args.index_dir, verify_checksums=not args.skip_checksums)
+    time_end = time.perf_counter()
+
+    if manifest is not None and stats is not None:
+        print_summary(manifest, stats)
+
+    if errors:
+        print(f"\nIndex is INVALID ({len(errors)} problems):")
+        for error in errors:
+            print(f"  - {error}")
+    else:
+        print("\nIndex is valid.")
+    print(f"Validation took {(time_end - time_start) * 1000:.3f} ms")
+
+    sys.exit(1 if errors else 0)
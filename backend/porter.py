@@ -0,0 +1,268 @@
+''' Porter stemmer
+
+    A copy of NLTK's PorterStemmer in its default NLTK_EXTENSIONS mode (nltk 3.9.1, nltk/stem/porter.py),
+    so search.py and suggest.py can stem queries without importing NLTK. Importing nltk.stem runs nltk/__init__,
+    which imports most of NLTK and took about 190 ms of every worker's first query.
+
+    The indexer still stems pages with NLTK's PorterStemmer; tests/test_porter.py checks that both give the same stems.
+
+    Porter, M. "An algorithm for suffix stripping." Program 14.3 (1980): 130-137.
+    Step numbers below follow the paper.
+'''
+
+vowels = frozenset(["a", "e", "i", "o", "u"])
+
+# Irregular forms NLTK stems by lookup instead of by the rules (form : stem)
+irregular_forms = {
+    "sky": ["sky", "skies"],
+    "die": ["dying"],
+    "lie": ["lying"],
+    "tie": ["tying"],
+    "news": ["news"],
+    "inning": ["innings", "inning"],
+    "outing": ["outings", "outing"],
+    "canning": ["cannings", "canning"],
+    "howe": ["howe"],
+    "proceed": ["proceed"],
+    "exceed": ["exceed"],
+    "succeed": ["succeed"],
+}
+irregular_stems = {form: stem for stem, forms in irregular_forms.items() for form in forms}
+
+
+def is_consonant(word, i):
+    # A consonant is a letter other than a, e, i, o, u, and other than a y preceded by a consonant
+    # INPUT:
+    #   - word: the word
+    #   - i: position of the letter in word
+    # OUTPUT: True if word[i] is a consonant
+
+    if word[i] in vowels:
+        return False
+    if word[i] == "y":
+        return i == 0 or not is_consonant(word, i - 1)
+    return True
+
+
+def measure(stem):
+    # The number of vowel-consonant sequences m, writing stem as [C](VC){m}[V]
+    # Ex. "tree" -> 0, "trouble" -> 1, "troubles" -> 2
+    # INPUT: part of a word
+    # OUTPUT: m
+
+    cv_sequence = "".join("c" if is_consonant(stem, i) else "v" for i in range(len(stem)))
+    return cv_sequence.count("vc")
+
+
+def has_positive_measure(stem):
+    return measure(stem) > 0
+
+
+def contains_vowel(stem):
+    return any(not is_consonant(stem, i) for i in range(len(stem)))
+
+
+def ends_double_consonant(word):
+    # Condition *d: word ends with two of the same consonant
+    return len(word) >= 2 and word[-1] == word[-2] and is_consonant(word, len(word) - 1)
+
+
+def ends_cvc(word):
+    # Condition *o: word ends consonant-vowel-consonant, where the last consonant is not w, x or y ("wil", "hop")
+    # NLTK also counts two-letter words that are vowel-consonant ("at")
+
+    return (
+        len(word) >= 3
+        and is_consonant(word, len(word) - 3)
+        and not is_consonant(word, len(word) - 2)
+        and is_consonant(word, len(word) - 1)
+        and word[-1] not in ("w", "x", "y")
+    ) or (len(word) == 2 and not is_consonant(word, 0) and is_consonant(word, 1))
+
+
+def apply_rule_list(word, rules):
+    # Applies the first rule whose suffix word ends with
+    # Once a suffix matches, no later rule is tried, even if the rule's condition fails
+    # INPUT:
+    #   - word: the word
+    #   - rules: list of (suffix, replacement, condition on the stem or None), where the suffix "*d" matches a double consonant
+    # OUTPUT: the word with the rule applied
+
+    for suffix, replacement, condition in rules:
+        if suffix == "*d" and ends_double_consonant(word):
+            stem = word[:-2]
+        elif word.endswith(suffix):
+            stem = word[: len(word) - len(suffix)]
+        else:
+            continue
+
+        if condition is None or condition(stem):
+            return stem + replacement
+        return word
+
+    return word
+
+
+def step1a(word):
+    # Plurals: "caresses" -> "caress", "ponies" -> "poni", "cats" -> "cat", and (NLTK) "dies" -> "die"
+
+    if word.endswith("ies") and len(word) == 4:
+        return word[:-3] + "ie"
+
+    return apply_rule_list(word, [
+        ("sses", "ss", None),
+        ("ies", "i", None),
+        ("ss", "ss", None),
+        ("s", "", None),
+    ])
+
+
+def step1b(word):
+    # Past tenses and -ing: "agreed" -> "agree", "plastered" -> "plaster", "motoring" -> "motor", "hopping" -> "hop", "filing" -> "file"
+
+    # NLTK: "spied" -> "spi" but "died" -> "die"
+    if word.endswith("ied"):
+        return word[:-3] + ("ie" if len(word) == 4 else "i")
+
+    if word.endswith("eed"):
+        stem = word[:-3]
+        return stem + "ee" if measure(stem) > 0 else word
+
+    for suffix in ["ed", "ing"]:
+        if word.endswith(suffix) and contains_vowel(word[: -len(suffix)]):
+            stem = word[: -len(suffix)]
+            break
+    else:
+        return word
+
+    # Put back an e on -at, -bl, -iz so step 4 can recognise -ate, -ble, -ize, undouble consonants other than l, s, z
+    return apply_rule_list(stem, [
+        ("at", "ate", None),
+        ("bl", "ble", None),
+        ("iz", "ize", None),
+        ("*d", stem[-1], lambda _: stem[-1] not in ("l", "s", "z")),
+        ("", "e", lambda stem: measure(stem) == 1 and ends_cvc(stem)),
+    ])
+
+
+def step1c(word):
+    # y -> i after a consonant, as long as the stem isn't that single consonant: "happy" -> "happi", "enjoy" and "by" are kept
+
+    return apply_rule_list(word, [("y", "i", lambda stem: len(stem) > 1 and is_consonant(stem, len(stem) - 1))])
+
+
+def step2(word):
+    # Double suffixes to single ones: "relational" -> "relate", "digitizer" -> "digitize", "hopefulness" -> "hopeful"
+
+    # NLTK applies alli -> al first, then runs step 2 again on the result
+    if word.endswith("alli") and has_positive_measure(word[:-4]):
+        return step2(word[:-4] + "al")
+
+    return apply_rule_list(word, [
+        ("ational", "ate", has_positive_measure),
+        ("tional", "tion", has_positive_measure),
+        ("enci", "ence", has_positive_measure),
+        ("anci", "ance", has_positive_measure),
+        ("izer", "ize", has_positive_measure),
+        ("bli", "ble", has_positive_measure),
+        ("alli", "al", has_positive_measure),
+        ("entli", "ent", has_positive_measure),
+        ("eli", "e", has_positive_measure),
+        ("ousli", "ous", has_positive_measure),
+        ("ization", "ize", has_positive_measure),
+        ("ation", "ate", has_positive_measure),
+        ("ator", "ate", has_positive_measure),
+        ("alism", "al", has_positive_measure),
+        ("iveness", "ive", has_positive_measure),
+        ("fulness", "ful", has_positive_measure),
+        ("ousness", "ous", has_positive_measure),
+        ("aliti", "al", has_positive_measure),
+        ("iviti", "ive", has_positive_measure),
+        ("biliti", "ble", has_positive_measure),
+        ("fulli", "ful", has_positive_measure),
+        # The l of logi stays with the stem, so short stems like "geo" and "theo" work too
+        ("logi", "log", lambda _: has_positive_measure(word[:-3])),
+    ])
+
+
+def step3(word):
+    # -ic-, -full, -ness etc.: "triplicate" -> "triplic", "formative" -> "form", "goodness" -> "good"
+
+    return apply_rule_list(word, [
+        ("icate", "ic", has_positive_measure),
+        ("ative", "", has_positive_measure),
+        ("alize", "al", has_positive_measure),
+        ("iciti", "ic", has_positive_measure),
+        ("ical", "ic", has_positive_measure),
+        ("ful", "", has_positive_measure),
+        ("ness", "", has_positive_measure),
+    ])
+
+
+def step4(word):
+    # Removes the remaining suffixes from long enough stems: "revival" -> "reviv", "adjustment" -> "adjust", "adoption" -> "adopt"
+
+    def measure_gt_1(stem):
+        return measure(stem) > 1
+
+    return apply_rule_list(word, [
+        ("al", "", measure_gt_1),
+        ("ance", "", measure_gt_1),
+        ("ence", "", measure_gt_1),
+        ("er", "", measure_gt_1),
+        ("ic", "", measure_gt_1),
+        ("able", "", measure_gt_1),
+        ("ible", "", measure_gt_1),
+        ("ant", "", measure_gt_1),
+        ("ement", "", measure_gt_1),
+        ("ment", "", measure_gt_1),
+        ("ent", "", measure_gt_1),
+        ("ion", "", lambda stem: measure(stem) > 1 and stem[-1] in ("s", "t")),
+        ("ou", "", measure_gt_1),
+        ("ism", "", measure_gt_1),
+        ("ate", "", measure_gt_1),
+        ("iti", "", measure_gt_1),
+        ("ous", "", measure_gt_1),
+        ("ive", "", measure_gt_1),
+        ("ize", "", measure_gt_1),
+    ])
+
+
+def step5a(word):
+    # Removes a final e: "probate" -> "probat", "cease" -> "ceas", but "rate" is kept
+    # Both conditions are tried, unlike apply_rule_list
+
+    if word.endswith("e"):
+        stem = word[:-1]
+        if measure(stem) > 1:
+            return stem
+        if measure(stem) == 1 and not ends_cvc(stem):
+            return stem
+
+    return word
+
+
+def step5b(word):
+    # -ll -> -l on long enough stems: "controll" -> "control", but "roll" is kept
+
+    return apply_rule_list(word, [("ll", "l", lambda _: measure(word[:-1]) > 1)])
+
+
+def porter_stem(word):
+    # Same output as nltk.stem.PorterStemmer().stem(word)
+    # INPUT: a word
+    # OUTPUT: its lowercase stem
+
+    stem = word.lower()
+
+    if word in irregular_stems:
+        return irregular_stems[stem]
+
+    # Words of one or two letters are never stemmed
+    if len(word) <= 2:
+        return stem
+
+    for step in [step1a, step1b, step1c, step2, step3, step4, step5a, step5b]:
+        stem = step(stem)
+
+    return stem
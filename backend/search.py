@@ -1,11 +1,12 @@
 import os
+import re
 import time
 import pickle
-from nltk.tokenize import word_tokenize # type: ignore
-from nltk.stem import PorterStemmer     # type: ignore
 from collections import Counter
 import heapq
 import math
+from lexicon import load_lexicon, find_term, lexicon_filename
+from porter import porter_stem
 
 # CHANGE THIS VARIABLE TO SHOWCASE HOW MANY URLS ARE DISPLAYED
 url_count = 5
@@ -31,6 +32,88 @@ stop_words = ['a', 'about', 'above', 'after', 'again', 'against', 'all', 'am', '
         'when', 'where', 'which', 'while', 'who', 'whom', 'why', 'will', 'with',
         'you', 'your', 'yours', 'yourself', 'yourselves']
 
+# word_tokenize splits text into sentences with punkt, then runs NLTKWordTokenizer's regexes on each sentence
+# The regexes are copied below (nltk 3.9.1, nltk/tokenize/destructive.py) so queries are split exactly like pages were at index time,
+# without importing NLTK or loading punkt. Sentences are split at ". ", "! " and "? ", which is what punkt does outside of abbreviations
+sentence_end_pattern = re.compile(r"(?<=[.!?])\s+")
+
+# Quotes, punctuation, brackets and dashes, in the order NLTKWordTokenizer applies them
+treebank_rules = [
+    # Starting quotes
+    (re.compile("([«“‘„]|[`]+)"), r" \1 "),
+    (re.compile(r"^\""), r"``"),
+    (re.compile(r"(``)"), r" \1 "),
+    (re.compile(r"([ \(\[{<])(\"|\'{2})"), r"\1 `` "),
+    (re.compile(r"(?i)(\')(?!re|ve|ll|m|t|s|d|n)(\w)\b"), r"\1 \2"),
+    # Punctuation
+    (re.compile(r'([^\.])(\.)([\]\)}>"\'' "»”’ " r"]*)\s*$"), r"\1 \2 \3 "),
+    (re.compile(r"([:,])([^\d])"), r" \1 \2"),
+    (re.compile(r"([:,])$"), r" \1 "),
+    (re.compile(r"\.{2,}"), r" \g<0> "),
+    (re.compile(r"[;@#$%&]"), r" \g<0> "),
+    (re.compile(r'([^\.])(\.)([\]\)}>"\']*)\s*$'), r"\1 \2\3 "),
+    (re.compile(r"[?!]"), r" \g<0> "),
+    (re.compile(r"([^'])' "), r"\1 ' "),
+    (re.compile(r"[*]"), r" \g<0> "),
+    # Parentheses/brackets and double dashes
+    (re.compile(r"[\]\[\(\)\{\}\<\>]"), r" \g<0> "),
+    (re.compile(r"--"), r" -- "),
+]
+
+# Ending quotes and clitics, applied after the sentence is padded with spaces ("don't" -> "do" + "n't", "cannot" -> "can" + "not")
+treebank_clitic_rules = [
+    (re.compile("([»”’])"), r" \1 "),
+    (re.compile(r"''"), " '' "),
+    (re.compile(r'"'), " '' "),
+    (re.compile(r"\s+"), " "),
+    (re.compile(r"([^' ])('[sS]|'[mM]|'[dD]|') "), r"\1 \2 "),
+    (re.compile(r"([^' ])('ll|'LL|'re|'RE|'ve|'VE|n't|N'T) "), r"\1 \2 "),
+] + [(re.compile(pattern), r" \1 \2 ") for pattern in [
+    r"(?i)\b(can)(?#X)(not)\b",
+    r"(?i)\b(d)(?#X)('ye)\b",
+    r"(?i)\b(gim)(?#X)(me)\b",
+    r"(?i)\b(gon)(?#X)(na)\b",
+    r"(?i)\b(got)(?#X)(ta)\b",
+    r"(?i)\b(lem)(?#X)(me)\b",
+    r"(?i)\b(more)(?#X)('n)\b",
+    r"(?i)\b(wan)(?#X)(na)(?=\s)",
+    r"(?i) ('t)(?#X)(is)\b",
+    r"(?i) ('t)(?#X)(was)\b",
+]]
+
+_warned_missing_lexicon = set()     # final_dirs we already warned have no lexicon.bin, so the warning is only printed once
+
+
+def treebank_tokenize(sentence):
+    # Same output as NLTKWordTokenizer().tokenize(sentence)
+    # INPUT: a single sentence
+    # OUTPUT: list of tokens, punctuation included
+
+    for regexp, substitution in treebank_rules:
+        sentence = regexp.sub(substitution, sentence)
+
+    sentence = " " + sentence + " "
+    for regexp, substitution in treebank_clitic_rules:
+        sentence = regexp.sub(substitution, sentence)
+
+    return sentence.split()
+
+
+def regex_tokenize(text):
+    # Splits text into the same alphanumeric tokens the indexer keeps
+    # The indexer runs word_tokenize and drops any token that isn't alphanumeric, so:
+    #   - "e-mail", "3.5", "1,000" are single word_tokenize tokens -> dropped
+    #   - "don't" -> "do" + "n't", "cannot" -> "can" + "not" -> "do", "can", "not" are kept
+    #   - "user@example.com" -> "user" + "@" + "example.com" -> only "user" is kept
+    # INPUT: text to tokenize
+    # OUTPUT: list of alphanumeric tokens
+
+    tokens = []
+    for sentence in sentence_end_pattern.split(text):
+        tokens.extend(token for token in treebank_tokenize(sentence) if token.isalnum())
+
+    return tokens
+
 
 def tokenize_query(query, remove_stopwords):
     # Tokenizes a user's query with the 
@@ -39,17 +122,14 @@ def tokenize_query(query, remove_stopwords):
     #   - remove_stopwords: boolean whether we want to remove (TRUE) or keep stopwords (FALSE)
     # OUTPUT: tokenized user query
 
-    stemmer = PorterStemmer()
-    tokens = word_tokenize(query.lower())
+    tokens = regex_tokenize(query.lower())
 
     # Filter stopwords if remove_stopwords = True
     if remove_stopwords:
-        tokens = [word for word in tokens if word.isalnum() and word.lower() not in stop_words]
-    else:
-        tokens = [word for word in tokens if word.isalnum()]
+        tokens = [word for word in tokens if word not in stop_words]
 
-    # Apply stemming
-    tokens = [stemmer.stem(word) for word in tokens]
+    # Apply stemming (same stems as NLTK's PorterStemmer, see porter.py)
+    tokens = [porter_stem(word) for word in tokens]
 
     return tokens
 
@@ -63,38 +143,66 @@ def load_partial_inverted_index(filename):
         return pickle.load(file)
 
 
+def get_lexicon(final_dir):
+    # Loads lexicon.bin, or returns None for an index built before it existed so search can fall back to the key_*.pkl files
+    # The check is repeated on every call, so a running worker picks up lexicon.bin as soon as 'python lexicon.py' creates it
+    # INPUT: final_dir: where alphabetical indexes are stored
+    # OUTPUT: the lexicon from load_lexicon, or None
+
+    if not os.path.exists(os.path.join(final_dir, lexicon_filename)):
+        if final_dir not in _warned_missing_lexicon:
+            print(f"Warning: no {lexicon_filename} in {final_dir}, falling back to key_*.pkl files. Run 'python lexicon.py' to build it.")
+            _warned_missing_lexicon.add(final_dir)
+        return None
+
+    return load_lexicon(final_dir)
+
+
+def load_total_documents(final_dir):
+    # INPUT: final_dir: where alphabetical indexes are stored
+    # OUTPUT: total number of documents in the corpus, for idf
+
+    lexicon = get_lexicon(final_dir)
+    if lexicon is not None:
+        return lexicon["num_documents"]
+
+    return load_partial_inverted_index(os.path.join(final_dir, "total_documents.pkl"))
+
+
 def find_chunk_for_term(term, final_dir):
     # Since terms.pkl files are lexographically sorted and broken into different chunk sizes (defined on indexer.py), we can avoid going through each individual .pkl file to find a term
-    # "key_{first_letter}.pkl" holds a tuple of every last term in an index along with the index name: (term : file name where the term the last term in)
-    # Function shifts through all keys.pkl and compares a searched-for term and the last term in every .pkl file
+    # lexicon.bin (see lexicon.py) stores every term along with the term.pkl file it was saved in, so one binary search finds the right file
+    # Terms that aren't in the lexicon at all are skipped without loading anything
+    # Without a lexicon.bin, "key_{first_letter}.pkl" holds a tuple of every last term in an index along with the index name: (term : file name where the term the last term in)
+    # and the first chunk whose last term is >= term is used
     # Ex. term = "apple", key_A.pkl contains (aaaa : term_AP1.pkl), (aabb : term_AP2.pkl), (azzz : term_AP3.pkl). So "apple" must be in term_AP3.pkl
     # INPUT:
     #   - term: term we want to find the term.pkl file for
     #   - final_dir: where alphabetical indexes are stored
     # OUTPUT:
-    #   - returns both the term.pkl file and filename of the file
+    #   - returns the filename of the term.pkl file, or None if the term isn't indexed
 
-    first_letter = term[0].upper()
+    lexicon = get_lexicon(final_dir)
+
+    if lexicon is not None:
+        i = find_term(term, lexicon)
+        if i is None:
+            return None
+        return lexicon["chunk_files"][lexicon["chunk_ids"][i]]
 
     # Load lookup dictionary for letter
-    lookup_file = os.path.join(final_dir, f"key_{first_letter}.pkl")
+    lookup_file = os.path.join(final_dir, f"key_{term[0].upper()}.pkl")
+    if not os.path.exists(lookup_file):
+        return None
     lookup_dict = load_partial_inverted_index(lookup_file)
 
     # Search for term.pkl file
-    target_file = None
     for last_term, file in sorted(lookup_dict.items()):
         if term <= last_term:
-            target_file = file
-            break
-    
-    # No associated term.pkl file found
-    if target_file is None:
-        return None, None
-    
-    # Load chunk file
-    chunk_data = load_partial_inverted_index(target_file)
+            return file
 
-    return chunk_data, target_file
+    # No associated term.pkl file found
+    return None
 
 
 def load_term_data(query_tokens, final_dir):
@@ -116,28 +224,20 @@ def load_term_data(query_tokens, final_dir):
         # Checks for invalid tokens
         if not token:
             continue
-        
-        # Checks for if token exists in already loaded chunks
-        token_found = False
-        for chunk_data in loaded_chunks.values():
-            if token in chunk_data:
-                term_data[token] = chunk_data[token]
-                token_found = True
-                break
-
-        # Found in cache
-        if token_found:
+
+        # Not in the index
+        chunk_filename = find_chunk_for_term(token, final_dir)
+        if chunk_filename is None:
             continue
 
-        # Not found in cache
-        chunk_data, chunk_filename = find_chunk_for_term(token, final_dir)
+        # Not found in cache -> load and store in cache
+        if chunk_filename not in loaded_chunks:
+            loaded_chunks[chunk_filename] = load_partial_inverted_index(chunk_filename)
+
+        chunk_data = loaded_chunks[chunk_filename]
+        if token in chunk_data:
+            term_data[token] = chunk_data[token]
 
-        # Valid data found -> store in cache
-        if chunk_data and chunk_filename:
-            loaded_chunks[chunk_filename] = chunk_data
-            if token in chunk_data:
-                term_data[token] = chunk_data[token]
-        
     return term_data
 
 
@@ -167,8 +267,7 @@ def search(query, final_dir):
     # Track tf-idf scores
     document_scores = Counter()
 
-    N_directory = os.path.join(final_dir, f"total_documents.pkl")
-    N = load_partial_inverted_index(N_directory)
+    N = load_total_documents(final_dir)
 
     # Calculate tf-idf scores
     for token in query_tokens:
@@ -246,8 +345,7 @@ def boolean_query(query, final_dir):
     # Track tf-idf scores
     document_scores = Counter()
 
-    N_directory = os.path.join(final_dir, f"total_documents.pkl")
-    N = load_partial_inverted_index(N_directory)
+    N = load_total_documents(final_dir)
 
     # Calculate tf-idf scores
     for token in query_tokens:
@@ -0,0 +1,273 @@
+import time
+import heapq
+from bisect import bisect_left
+from lexicon import load_lexicon, find_term, surface_form, top_terms_for_prefix
+from search import regex_tokenize, stop_words
+from porter import porter_stem
+
+# CHANGE THIS VARIABLE TO SHOWCASE HOW MANY SUGGESTIONS ARE RETURNED
+suggestion_count = 5
+
+# CHANGE THIS TO WHERE PARTIAL ALPHABETICAL INDEXES ARE STORED
+final_dir = "./index/"
+
+max_edit_distance = 2               # Largest number of typos we try to correct in a single word
+max_levenshtein_rows = 600          # Cap on Levenshtein rows one suggestion may compute, split between its misspelled words (about 5 us per row)
+
+
+def prefix_range(prefix, terms, lo=0, hi=None):
+    # Finds the slice of the sorted terms that start with prefix, using two binary searches
+    # Ex. prefix = b"comp", terms = (..., b"compil", b"compon", b"comput", b"con", ...) -> every term between b"comp" and b"comq"
+    # INPUT:
+    #   - prefix: a utf-8 encoded prefix
+    #   - terms: MappedTerms from load_lexicon
+    #   - lo, hi: an already known slice to search within
+    # OUTPUT: (lo, hi) where terms[lo:hi] all start with prefix
+
+    if hi is None:
+        hi = len(terms)
+    if not prefix:
+        return lo, hi
+
+    # Everything with this prefix is < prefix with its last byte bumped by one (0xFF never appears in utf-8)
+    lo = bisect_left(terms, prefix, lo, hi)
+    hi = bisect_left(terms, prefix[:-1] + bytes((prefix[-1] + 1,)), lo, hi)
+
+    return lo, hi
+
+
+def complete_prefix(prefix, lexicon, limit):
+    # Finds the most popular words starting with prefix
+    # The index stores stems, so the candidates are the stems starting with prefix ("comp" -> "comput") plus the stems
+    # that prefix has already typed past ("computi" -> "comput"), and each is shown as its surface form ("computer")
+    # Surface forms that don't start with what was typed are skipped
+    # INPUT:
+    #   - prefix: the partially typed word
+    #   - lexicon: from load_lexicon
+    #   - limit: maximum number of completions
+    # OUTPUT: up to limit surface forms, highest df first
+
+    terms, dfs = lexicon["terms"], lexicon["dfs"]
+    if not prefix:
+        return []
+
+    # A few spare candidates make up for the ones whose surface form is skipped
+    # Short prefixes match a large part of the vocabulary, so their top terms are precomputed in lexicon.bin
+    key = prefix.encode("utf-8")
+    top_terms = top_terms_for_prefix(key, lexicon)
+    if top_terms is None:
+        lo, hi = prefix_range(key, terms)
+        top_terms = heapq.nlargest(limit * 2, range(lo, hi), key=lambda i: dfs[i])
+    candidates = set(top_terms[:limit * 2])
+
+    for length in range(1, len(prefix)):
+        i = find_term(prefix[:length], lexicon)
+        if i is not None:
+            candidates.add(i)
+
+    completions = []
+    for i in sorted(candidates, key=lambda i: (-dfs[i], i)):
+        surface = surface_form(i, lexicon)
+        if surface.startswith(prefix) and surface not in completions:
+            completions.append(surface)
+        if len(completions) == limit:
+            break
+
+    return completions
+
+
+def next_levenshtein_row(row, word, char, depth, max_distance):
+    # Computes the next row of the Levenshtein table when one more character is added to the candidate term
+    # Only cells within max_distance of the diagonal can end up <= max_distance, so every other cell is just capped at max_distance + 1
+    # INPUT:
+    #   - row: the row for the candidate's prefix so far
+    #   - word: the word we are comparing against
+    #   - char: the next character of the candidate
+    #   - depth: length of the candidate's prefix once char is added
+    #   - max_distance: the largest edit distance we care about
+    # OUTPUT: the new row, where row[col] = edit distance between the candidate prefix and word[:col] (capped at max_distance + 1)
+
+    cap = max_distance + 1
+    next_row = [cap] * (len(word) + 1)
+    next_row[0] = min(depth, cap)
+
+    # Called once per child of every visited node, so the minimums are written out instead of calling min()
+    start, end = max(1, depth - max_distance), min(len(word), depth + max_distance)
+    left = next_row[start - 1] if start <= end else cap
+    for col in range(start, end + 1):
+        value = row[col - 1] if word[col - 1] == char else row[col - 1] + 1
+        if row[col] < value:
+            value = row[col] + 1
+        if left < value:
+            value = left + 1
+        if value > cap:
+            value = cap
+        next_row[col] = left = value
+
+    return next_row
+
+
+def fuzzy_lookup(word, lexicon, max_distance, max_rows, anchor_length=1, closest_only=False):
+    # Finds every term within max_distance edits (insert, delete, substitute) of word
+    # Walks the sorted lexicon as if it were a trie: each shared prefix is a node, and its children are found with binary search
+    # One row of the Levenshtein table is computed per child, and a branch is dropped as soon as every cell in its row is too large,
+    # so only a tiny part of the vocabulary is ever looked at
+    # The smallest cell in a node's row is a lower bound on the distance of every term under it, so nodes are visited smallest bound
+    # first: close terms are found before far ones, and with closest_only the walk stops once no node can hold a term as close as the closest found
+    # Typos rarely hit the first letter, so the first anchor_length characters must match exactly, which keeps the walk small
+    # The walk also stops after computing max_rows rows, returning whatever it found so far. One-edit terms are usually found within
+    # a couple hundred rows, but a two-edit term is only reached once every one-edit branch is ruled out, which can take over a thousand
+    # Distances are counted in utf-8 bytes, which is the same as characters for the (almost entirely ascii) vocabulary
+    # INPUT:
+    #   - word: the (possibly misspelled) word
+    #   - lexicon: from load_lexicon
+    #   - max_distance: the largest edit distance to accept
+    #   - max_rows: how many Levenshtein rows the walk may compute
+    #   - anchor_length: how many leading characters must match exactly
+    #   - closest_only: only look for the terms at the smallest distance (the others found along the way are still returned)
+    # OUTPUT: a list of (term, distance, df)
+
+    terms, dfs = lexicon["terms"], lexicon["dfs"]
+    word = word.encode("utf-8")
+    results = []
+
+    # Start the walk at the node for the anchored prefix
+    prefix = word[:anchor_length]
+    row = [min(col, max_distance + 1) for col in range(len(word) + 1)]
+    for depth, char in enumerate(prefix, 1):
+        row = next_levenshtein_row(row, word, char, depth, max_distance)
+
+    lo, hi = prefix_range(prefix, terms)
+
+    # Heap of (lower bound, -depth, prefix, lo, hi, row) where terms[lo:hi] all start with prefix
+    # Among nodes with the same bound, deeper ones come first since they are closer to complete terms
+    heap = [(min(row), -len(prefix), prefix, lo, hi, row)] if lo < hi else []
+    rows = len(prefix)
+
+    while heap and rows < max_rows:
+        bound, _, prefix, lo, hi, row = heapq.heappop(heap)
+        if bound > max_distance:
+            break
+
+        depth = len(prefix)
+        i = lo
+
+        # The prefix is a complete term itself (it always sorts first in its slice)
+        if terms[i] == prefix:
+            if row[-1] <= max_distance:
+                results.append((prefix.decode("utf-8"), row[-1], dfs[i]))
+                if closest_only:
+                    max_distance = row[-1]
+            i += 1
+
+        # Visit each child, one next byte at a time (no binary search needed for the last one, often the only one)
+        last_char = terms[hi - 1][depth] if i < hi else None
+        while i < hi and rows < max_rows:
+            char = terms[i][depth]
+            j = hi if char == last_char else bisect_left(terms, prefix + bytes((char + 1,)), i, hi)
+
+            next_row = next_levenshtein_row(row, word, char, depth + 1, max_distance)
+            rows += 1
+            next_bound = min(next_row)
+            if next_bound <= max_distance:
+                heapq.heappush(heap, (next_bound, -depth - 1, prefix + bytes((char,)), i, j, next_row))
+
+            i = j
+
+    return results
+
+
+def correct_word(word, lexicon, max_rows):
+    # Picks the closest, most popular term for a word that is not in the index, and returns how users would write it
+    # A single walk finds the closest terms first (a single typo is by far the most common case), and only keeps
+    # looking for two-edit terms when there is no one-edit term
+    # Short words never get two edits so that "cat" isn't "corrected" to "at"
+    # INPUT:
+    #   - word: a stemmed query word
+    #   - lexicon: from load_lexicon
+    #   - max_rows: how many Levenshtein rows the search may compute
+    # OUTPUT: the surface form of the best replacement term, or None
+
+    max_distance = 1 if len(word) <= 4 else max_edit_distance
+    candidates = fuzzy_lookup(word, lexicon, max_distance, max_rows, closest_only=True)
+
+    # Smallest distance wins, ties go to the term found in the most documents
+    if not candidates:
+        return None
+
+    best_term, _, _ = min(candidates, key=lambda x: (x[1], -x[2]))
+    return surface_form(find_term(best_term, lexicon), lexicon)
+
+
+def token_spans(text):
+    # Finds where each token regex_tokenize keeps is in text, so the rest of the text can be left as typed
+    # Kept tokens are always alphanumeric pieces of text, in order ("cannot" -> "can" + "not", "c++" and "e-mail" -> nothing)
+    # INPUT: lowercase text
+    # OUTPUT: list of (token, start, end) where text[start:end] == token
+
+    spans = []
+    position = 0
+    for token in regex_tokenize(text):
+        start = text.find(token, position)
+        position = start + len(token)
+        spans.append((token, start, position))
+
+    return spans
+
+
+def suggest(query, final_dir):
+    # Helper function for the /suggest endpoint
+    # INPUT:
+    #   - query: whatever the user has typed so far
+    #   - final_dir: where alphabetical indexes are stored
+    # OUTPUT: a dictionary with
+    #   - completions: up to suggestion_count queries finishing the last word being typed
+    #   - correction: a "did you mean" query, or None if every word is already in the index
+    # Only the words being completed or corrected are replaced, everything else (case, punctuation, "c++") is returned as typed
+
+    global suggestion_count
+
+    lexicon = load_lexicon(final_dir)
+
+    # lower() changes the length of a few non-ascii characters, then the lowercase query is what gets returned
+    lowered = query.lower()
+    text = query if len(lowered) == len(query) else lowered
+    spans = token_spans(lowered)
+    words = [word for word, _, _ in spans]
+
+    if not words:
+        return {"completions": [], "correction": None}
+
+    # Prefix completion on the last word, replacing it and anything typed after it
+    head = text[:spans[-1][1]]
+    completions = [head + term for term in complete_prefix(words[-1], lexicon, suggestion_count)]
+
+    # Spelling correction on every word, looked up in stemmed form since that is what the index stores
+    # A word that is still being typed isn't corrected, and max_levenshtein_rows is shared by the words that need it
+    stems = [porter_stem(word) for word in words]
+    misspelled = [
+        i for i, word in enumerate(words)
+        if not (i == len(words) - 1 and completions) and word not in stop_words and find_term(stems[i], lexicon) is None
+    ]
+
+    # Swap each corrected word into the text as typed
+    corrected = []
+    position = 0
+    for i in misspelled:
+        replacement = correct_word(stems[i], lexicon, max_levenshtein_rows // len(misspelled))
+        if replacement is not None:
+            _, start, end = spans[i]
+            corrected.extend([text[position:start], replacement])
+            position = end
+
+    return {"completions": completions, "correction": "".join(corrected) + text[position:] if corrected else None}
+
+
+if __name__ == "__main__":
+    # Times a few suggestions against the index in final_dir
+
+    for query in ["comp", "sofware enginering", "machne lerning"]:
+        time_start = time.perf_counter()
+        result = suggest(query, final_dir)
+        time_end = time.perf_counter()
+        print(f"{query!r}: {result} ({(time_end - time_start) * 1000:.3f} ms)")
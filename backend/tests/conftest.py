@@ -0,0 +1,43 @@
+import os
+import sys
+import pickle
+
+import pytest
+
+# The backend modules import each other as top-level scripts (python search.py, flask --app app.py run)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    # Factory that writes a small index the way indexer.py lays it out on disk
+    # INPUT (to the returned function):
+    #   - chunks: (terms_*.pkl filename : (term : (document : count))), each chunk holding terms of a single first letter
+    #   - num_documents: saved as total_documents.pkl
+    #   - surface_forms: saved as surface_forms.pkl if given
+    #   - name: subfolder of tmp_path to write into, so one test can build several indexes
+    # OUTPUT (of the returned function): the index folder, with terms_*.pkl, key_*.pkl and total_documents.pkl
+
+    def make_index(chunks, num_documents=4, surface_forms=None, name="index"):
+        final_dir = os.path.join(str(tmp_path), name)
+        os.makedirs(final_dir)
+
+        # key_{letter}.pkl maps each chunk's last term to its full path, like split_final_index_alphabetically
+        keys = {}
+        for filename, chunk_data in chunks.items():
+            with open(os.path.join(final_dir, filename), "wb") as file:
+                pickle.dump(chunk_data, file)
+            keys.setdefault(min(chunk_data)[0].upper(), {})[max(chunk_data)] = os.path.join(final_dir, filename)
+
+        for letter, lookup_dict in keys.items():
+            with open(os.path.join(final_dir, f"key_{letter}.pkl"), "wb") as file:
+                pickle.dump(lookup_dict, file)
+        with open(os.path.join(final_dir, "total_documents.pkl"), "wb") as file:
+            pickle.dump(num_documents, file)
+        if surface_forms is not None:
+            with open(os.path.join(final_dir, "surface_forms.pkl"), "wb") as file:
+                pickle.dump(surface_forms, file)
+
+        return final_dir
+
+    return make_index
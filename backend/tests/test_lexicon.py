@@ -0,0 +1,75 @@
+import os
+
+from lexicon import save_lexicon, load_lexicon, map_lexicon, find_term, surface_form, rebuild_lexicon_from_chunks, lexicon_filename
+
+
+def make_lexicon(final_dir, entries, num_documents=10):
+    save_lexicon(entries, num_documents, str(final_dir))
+    return load_lexicon(str(final_dir))
+
+
+def test_round_trip(tmp_path):
+    entries = [
+        ("comput", 7, "./index/terms_CP2.pkl", "computer"),
+        ("apple", 3, "./index/terms_A.pkl", "apple"),
+        ("compil", 2, "./index/terms_CP1.pkl", "compiler"),
+        ("café", 1, "./index/terms_CP1.pkl", "cafés"),
+    ]
+    lexicon = make_lexicon(tmp_path, entries, num_documents=42)
+
+    assert lexicon["num_documents"] == 42
+    assert [lexicon["terms"][i].decode("utf-8") for i in range(len(lexicon["terms"]))] == ["apple", "café", "compil", "comput"]
+
+    for term, df, chunk_filename, surface in entries:
+        i = find_term(term, lexicon)
+        assert i is not None
+        assert lexicon["dfs"][i] == df
+        assert lexicon["chunk_files"][lexicon["chunk_ids"][i]] == os.path.join(str(tmp_path), os.path.basename(chunk_filename))
+        assert surface_form(i, lexicon) == surface
+
+    assert find_term("banana", lexicon) is None
+    assert find_term("compu", lexicon) is None
+    assert find_term("zzz", lexicon) is None
+
+
+def test_empty_lexicon(tmp_path):
+    lexicon = make_lexicon(tmp_path, [], num_documents=0)
+
+    assert len(lexicon["terms"]) == 0
+    assert lexicon["chunk_files"] == []
+    assert lexicon["num_documents"] == 0
+    assert find_term("anything", lexicon) is None
+
+
+def test_rebuild_from_chunks_matches_indexer_output(index_dir):
+    chunks = {
+        "terms_AP1.pkl": {"ant": {"d1": 2, "d2": 1}, "apple": {"d3": 1}},
+        "terms_AP2.pkl": {"axe": {"d1": 1}},
+        "terms_B.pkl": {"bee": {"d2": 4, "d3": 1, "d4": 1}},
+    }
+    surface_forms = {"ant": "ants", "bee": "bees"}
+    final_dir = index_dir(chunks, surface_forms=surface_forms)
+
+    rebuild_lexicon_from_chunks(final_dir)
+    with open(os.path.join(final_dir, lexicon_filename), "rb") as file:
+        rebuilt = file.read()
+
+    # Same entries the indexer would have written
+    entries = [(term, len(doc_map), filename, surface_forms.get(term, term)) for filename, chunk_data in chunks.items() for term, doc_map in chunk_data.items()]
+    expected_dir = os.path.join(os.path.dirname(final_dir), "expected")
+    save_lexicon(entries, 4, expected_dir)
+    with open(os.path.join(expected_dir, lexicon_filename), "rb") as file:
+        assert file.read() == rebuilt
+
+
+def test_rewrite_keeps_existing_mappings_readable(tmp_path):
+    words = [f"term{i:05d}" for i in range(50000)]
+    lexicon = make_lexicon(tmp_path, [(word, 1, "terms_T.pkl", word) for word in words])
+
+    # Truncating the mapped file in place would make the next lookup die with a bus error
+    save_lexicon([("a", 1, "terms_A.pkl", "a")], 10, str(tmp_path))
+
+    assert find_term("term49999", lexicon) == 49999
+    assert len(load_lexicon(str(tmp_path))["terms"]) == 50000
+    assert len(map_lexicon(str(tmp_path))["terms"]) == 1
+    assert not os.path.exists(os.path.join(str(tmp_path), lexicon_filename + ".tmp"))
@@ -0,0 +1,58 @@
+import os
+import json
+import pickle
+
+import pytest
+
+from lexicon import rebuild_lexicon_from_chunks
+from manifest import write_manifest, validate_index, read_total_documents, manifest_filename
+
+
+@pytest.fixture
+def manifest_dir(index_dir):
+    final_dir = index_dir({
+        "terms_AP1.pkl": {"ant": {"d1": 2, "d2": 1}, "apple": {"d3": 1}},
+        "terms_AP2.pkl": {"axe": {"d1": 1}},
+        "terms_B.pkl": {"bee": {"d2": 4, "d3": 1, "d4": 1}},
+    })
+    rebuild_lexicon_from_chunks(final_dir)
+    write_manifest(final_dir, 4)
+    return final_dir
+
+
+def test_valid_index(manifest_dir):
+    manifest, stats, errors = validate_index(manifest_dir)
+
+    assert errors == []
+    assert manifest["num_terms"] == stats["num_terms"] == 4
+    assert manifest["num_postings"] == 7
+    assert manifest["df_histogram"] == stats["df_histogram"] == {"1": 2, "2-3": 2}
+
+
+def test_changed_chunk_is_invalid(manifest_dir):
+    with open(os.path.join(manifest_dir, "terms_B.pkl"), "wb") as file:
+        pickle.dump({"bee": {"d2": 4}}, file)
+
+    _, _, errors = validate_index(manifest_dir)
+    assert any("terms_B.pkl" in error for error in errors)
+
+
+@pytest.mark.parametrize("contents", ["{", "[]", json.dumps({"build_id": "x"}), json.dumps({"files": {"a": 1}})])
+def test_malformed_manifest_is_reported(manifest_dir, contents):
+    with open(os.path.join(manifest_dir, manifest_filename), "w") as file:
+        file.write(contents)
+
+    manifest, stats, errors = validate_index(manifest_dir)
+    assert manifest is None and stats is None
+    assert errors
+
+
+def test_rewriting_manifest_after_lexicon_rebuild(manifest_dir):
+    # A new surface_forms.pkl changes lexicon.bin once it is rebuilt
+    with open(os.path.join(manifest_dir, "surface_forms.pkl"), "wb") as file:
+        pickle.dump({"bee": "bees"}, file)
+    rebuild_lexicon_from_chunks(manifest_dir)
+    assert validate_index(manifest_dir)[2] != []
+
+    write_manifest(manifest_dir, read_total_documents(manifest_dir))
+    assert validate_index(manifest_dir)[2] == []
@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from porter import porter_stem
+
+nltk_stem = pytest.importorskip("nltk.stem")
+
+# Examples from the paper and NLTK's extensions, one or more per rule
+examples = [
+    "caresses", "ponies", "ties", "caress", "cats", "dies", "flies", "feed", "agreed", "plastered", "bled", "motoring",
+    "sing", "conflated", "troubled", "sized", "hopping", "tanned", "falling", "hissing", "fizzed", "failing", "filing",
+    "spied", "died", "happy", "sky", "skies", "enjoy", "spy", "by", "relational", "conditional", "rational", "valenci",
+    "hesitanci", "digitizer", "conformabli", "radicalli", "differentli", "vileli", "analogousli", "vietnamization",
+    "predication", "operator", "feudalism", "decisiveness", "hopefulness", "callousness", "formaliti", "sensitiviti",
+    "sensibiliti", "fulli", "geology", "theology", "archaeology", "triplicate", "formative", "formalize", "electriciti",
+    "electrical", "hopeful", "goodness", "revival", "allowance", "inference", "airliner", "gyroscopic", "adjustable",
+    "defensible", "irritant", "replacement", "adjustment", "dependent", "adoption", "homologou", "communism", "activate",
+    "angulariti", "homologous", "effective", "bowdlerize", "probate", "rate", "cease", "controll", "roll", "dying",
+    "lying", "tying", "news", "innings", "outings", "cannings", "howe", "proceed", "exceed", "succeed", "generously",
+    "a", "is", "at", "y", "yy", "syzygy", "toy", "ivy", "oaten", "orrery", "Running", "CATS", "Skies", "café",
+    "naïve", "x86", "h2o", "2024", "computer", "computing", "computation", "engineering", "retrieval", "information",
+]
+
+roots = ["comput", "engin", "relat", "gener", "condit", "happ", "sens", "form", "electr", "hope", "adopt", "y", "ab", "sky"]
+suffixes = [
+    "", "s", "es", "ies", "ied", "eed", "ed", "ing", "y", "ational", "tional", "enci", "anci", "izer", "bli", "alli",
+    "entli", "eli", "ousli", "ization", "ation", "ator", "alism", "iveness", "fulness", "ousness", "aliti", "iviti",
+    "biliti", "fulli", "logi", "icate", "ative", "alize", "iciti", "ical", "ful", "ness", "al", "ance", "ence", "er",
+    "ic", "able", "ible", "ant", "ement", "ment", "ent", "sion", "tion", "ou", "ism", "ate", "iti", "ous", "ive", "ize",
+    "e", "ll",
+]
+
+
+@pytest.mark.parametrize("word", examples)
+def test_porter_stem_matches_nltk(word):
+    assert porter_stem(word) == nltk_stem.PorterStemmer().stem(word)
+
+
+def test_porter_stem_matches_nltk_on_every_suffix():
+    stemmer = nltk_stem.PorterStemmer()
+
+    for root in roots:
+        for suffix in suffixes:
+            for second_suffix in ["", "s", "ed", "ing", "ly", "ness"]:
+                word = root + suffix + second_suffix
+                assert porter_stem(word) == stemmer.stem(word), word
+
+
+def test_porter_stem_matches_nltk_on_random_words():
+    random.seed(121)
+    stemmer = nltk_stem.PorterStemmer()
+
+    for _ in range(20000):
+        word = "".join(random.choices("aeiouybcdglmnstz", k=random.randint(1, 14)))
+        assert porter_stem(word) == stemmer.stem(word), word
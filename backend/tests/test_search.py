@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from search import search, get_lexicon, regex_tokenize, treebank_tokenize
+from lexicon import rebuild_lexicon_from_chunks
+
+nltk_tokenize = pytest.importorskip("nltk.tokenize")
+
+# Punctuation edge cases, each a single sentence
+edge_cases = [
+    "cannot", "gonna", "gotta", "gimme", "lemme", "wanna go", "more'n", "d'ye", "'tis", "'twas",
+    "foo:bar", "user@example.com", "info@ics", "AT&T", "1,000", "3,36 euros", "c++ code", "c# and f#",
+    "don't", "DON'T", "it's", "they'll", "we're", "I've", "I'd", "I'm", "ma'am", "rock'n'roll", "o'neill",
+    "e-mail", "state-of-the-art", "3.5", "$3.88", "50%", "u.s.a", "U.S.", "end.", "end...", "wait...what",
+    "(foo)", "[bar]", "{baz}", "<tag>", "a--b", "a/b", "a\\b", "path/to/file.html", "http://www.ics.uci.edu/~fac",
+    "\"quoted\"", "''double''", "``tex``", "'single'", "«chevrons»", "“curly” ‘quotes’", "hello, world",
+    "semi;colon", "hash#tag", "wow!", "why?", "a*b", "under_score", "tab\tseparated", "multiple   spaces",
+    "café résumé", "naïve façade", "x86_64", "h2o", "2024-01-01", "10:30", "ics 121: information retrieval",
+]
+
+
+def alnum_tokens(text):
+    return [token for token in nltk_tokenize.word_tokenize(text, preserve_line=True) if token.isalnum()]
+
+
+@pytest.mark.parametrize("text", edge_cases)
+def test_treebank_tokenize_matches_nltk(text):
+    for case in (text, text.lower()):
+        assert treebank_tokenize(case) == nltk_tokenize.NLTKWordTokenizer().tokenize(case)
+
+
+@pytest.mark.parametrize("text", edge_cases)
+def test_regex_tokenize_matches_indexer_tokens(text):
+    assert regex_tokenize(text.lower()) == alnum_tokens(text.lower())
+
+
+def test_treebank_tokenize_matches_nltk_on_random_text():
+    random.seed(121)
+    alphabet = "abcnotgaymed019 '\"`,.:;@#$%&*?!()[]{}<>-+/_«»“”‘’"
+    tokenizer = nltk_tokenize.NLTKWordTokenizer()
+
+    for _ in range(2000):
+        text = "".join(random.choices(alphabet, k=random.randint(1, 30)))
+        assert treebank_tokenize(text) == tokenizer.tokenize(text), text
+
+
+def test_regex_tokenize_matches_word_tokenize_with_punkt():
+    try:
+        nltk_tokenize.word_tokenize("punkt check")
+    except LookupError:
+        pytest.skip("punkt_tab is not downloaded")
+
+    for text in edge_cases:
+        assert regex_tokenize(text.lower()) == [token for token in nltk_tokenize.word_tokenize(text.lower()) if token.isalnum()], text
+
+
+def test_regex_tokenize_splits_sentences():
+    assert regex_tokenize("machine learning. information retrieval") == ["machine", "learning", "information", "retrieval"]
+
+
+def test_search_falls_back_to_key_files_without_lexicon(index_dir):
+    final_dir = index_dir({
+        "terms_CP1.pkl": {"comput": {"d1": 3, "d2": 1}},
+        "terms_SP1.pkl": {"scienc": {"d2": 2, "d3": 1}, "softwar": {"d1": 1}},
+    })
+
+    without_lexicon = search("computer science", final_dir)
+    assert get_lexicon(final_dir) is None
+    assert [url for url, _ in without_lexicon] == ["d2", "d1", "d3"]
+    assert search("zebra", final_dir) == []
+
+    # Same results once lexicon.bin is built, without restarting
+    rebuild_lexicon_from_chunks(final_dir)
+    assert get_lexicon(final_dir) is not None
+    assert search("computer science", final_dir) == without_lexicon
+    assert search("zebra", final_dir) == []
@@ -0,0 +1,143 @@
+import time
+import random
+import heapq
+
+import pytest
+
+import suggest
+from lexicon import save_lexicon, load_lexicon, top_terms_for_prefix
+from suggest import prefix_range, complete_prefix, fuzzy_lookup, correct_word
+
+
+def levenshtein(a, b):
+    row = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        next_row = [i]
+        for j, char_b in enumerate(b, 1):
+            next_row.append(min(next_row[-1] + 1, row[j] + 1, row[j - 1] + (char_a != char_b)))
+        row = next_row
+    return row[-1]
+
+
+@pytest.fixture
+def random_lexicon(tmp_path):
+    random.seed(121)
+    words = {"".join(random.choices("abcde", k=random.randint(1, 8))) for _ in range(3000)}
+    entries = [(word, random.randint(1, 100), "terms_A.pkl", word) for word in words]
+    save_lexicon(entries, 100, str(tmp_path))
+    return load_lexicon(str(tmp_path)), sorted(words)
+
+
+def test_prefix_range_matches_brute_force(random_lexicon):
+    lexicon, words = random_lexicon
+    terms = lexicon["terms"]
+
+    for prefix in ["", "a", "ab", "abc", "eeee", "dcba", "abcdeabcd"]:
+        lo, hi = prefix_range(prefix.encode("utf-8"), terms)
+        assert [terms[i].decode("utf-8") for i in range(lo, hi)] == [word for word in words if word.startswith(prefix)]
+
+
+def test_fuzzy_lookup_matches_brute_force(random_lexicon):
+    lexicon, words = random_lexicon
+    random.seed(7)
+
+    for _ in range(100):
+        word = "".join(random.choices("abcdef", k=random.randint(1, 9)))
+        for max_distance in (1, 2):
+            found = sorted((term, distance) for term, distance, _ in fuzzy_lookup(word, lexicon, max_distance, max_rows=10**9))
+            expected = sorted(
+                (term, levenshtein(term, word)) for term in words
+                if term[0] == word[0] and levenshtein(term, word) <= max_distance
+            )
+            assert found == expected, (word, max_distance)
+
+
+def test_closest_only_finds_the_smallest_distance(random_lexicon):
+    lexicon, words = random_lexicon
+    random.seed(8)
+
+    for _ in range(100):
+        word = "".join(random.choices("abcdef", k=random.randint(1, 9)))
+        closest = min((levenshtein(term, word) for term in words if term[0] == word[0]), default=3)
+        found = fuzzy_lookup(word, lexicon, 2, max_rows=10**9, closest_only=True)
+        assert min((distance for _, distance, _ in found), default=3) == min(closest, 3), word
+
+
+def test_top_terms_match_prefix_scan(random_lexicon):
+    lexicon, words = random_lexicon
+    terms, dfs = lexicon["terms"], lexicon["dfs"]
+
+    for prefix in ["a", "e", "ab", "ed", "abc", "eee", "f", "fa"]:
+        lo, hi = prefix_range(prefix.encode("utf-8"), terms)
+        assert top_terms_for_prefix(prefix.encode("utf-8"), lexicon) == heapq.nlargest(10, range(lo, hi), key=lambda i: dfs[i]), prefix
+
+    assert top_terms_for_prefix(b"abcd", lexicon) is None
+
+
+def test_complete_prefix_shows_surface_forms(tmp_path):
+    entries = [
+        ("comput", 50, "terms_CP1.pkl", "computer"),
+        ("compil", 20, "terms_CP1.pkl", "compiler"),
+        ("compani", 30, "terms_CP1.pkl", "company"),
+        ("cat", 90, "terms_CP1.pkl", "cat"),
+    ]
+    save_lexicon(entries, 100, str(tmp_path))
+    lexicon = load_lexicon(str(tmp_path))
+
+    assert complete_prefix("comp", lexicon, 5) == ["computer", "company", "compiler"]
+    assert complete_prefix("comp", lexicon, 1) == ["computer"]
+
+    # Typed past the stem "comput", and its surface form still fits
+    assert complete_prefix("compute", lexicon, 5) == ["computer"]
+
+    # "compani" is a stem but its surface form "company" doesn't start with it
+    assert complete_prefix("compani", lexicon, 5) == []
+    assert complete_prefix("", lexicon, 5) == []
+
+
+def test_suggest_keeps_untouched_words_as_typed(tmp_path):
+    entries = [
+        ("softwar", 40, "terms_S.pkl", "software"),
+        ("engin", 30, "terms_E.pkl", "engineering"),
+        ("mail", 20, "terms_M.pkl", "mail"),
+    ]
+    save_lexicon(entries, 100, str(tmp_path))
+
+    # "engineering" is still being typed, so it is completed rather than corrected
+    assert suggest.suggest("C++ Sofware  Engineering", str(tmp_path)) == {
+        "completions": ["C++ Sofware  engineering"],
+        "correction": "C++ software  Engineering",
+    }
+    assert suggest.suggest("E-mail sofware?", str(tmp_path)) == {"completions": [], "correction": "E-mail software?"}
+    assert suggest.suggest("Software", str(tmp_path)) == {"completions": ["software"], "correction": None}
+    assert suggest.suggest("c++", str(tmp_path)) == {"completions": [], "correction": None}
+
+
+@pytest.fixture(scope="module")
+def large_lexicon(tmp_path_factory):
+    # About the size of the crawled index's vocabulary, and denser than real words, so the walks are at their largest
+    random.seed(121)
+    words = {"".join(random.choices("abcdefghijklmnopqrstuvwxyz", k=random.randint(3, 12))) for _ in range(300000)}
+    final_dir = str(tmp_path_factory.mktemp("large"))
+    save_lexicon([(word, random.randint(1, 1000), "terms_A.pkl", word) for word in words], 1000, final_dir)
+    return load_lexicon(final_dir)
+
+
+def test_suggestion_latency_on_large_lexicon(large_lexicon, monkeypatch):
+    rows = []
+    next_levenshtein_row = suggest.next_levenshtein_row
+    monkeypatch.setattr(suggest, "next_levenshtein_row", lambda *args: rows.append(1) or next_levenshtein_row(*args))
+
+    for word in ["dictionery", "implementaton", "retreival", "qzxv", "abcdefghijk"]:
+        rows.clear()
+        time_start = time.perf_counter()
+        correct_word(word, large_lexicon, suggest.max_levenshtein_rows)
+        elapsed = (time.perf_counter() - time_start) * 1000
+
+        assert len(rows) <= suggest.max_levenshtein_rows
+        assert elapsed < 25, word     # 2-4 ms here, with plenty of room for slow machines
+
+    for prefix in ["a", "co", "zzz", "abcd"]:
+        time_start = time.perf_counter()
+        complete_prefix(prefix, large_lexicon, 5)
+        assert (time.perf_counter() - time_start) * 1000 < 5, prefix